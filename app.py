@@ -1,658 +1,615 @@
 import streamlit as st
-import re
+import hashlib
+import math
 import plotly.graph_objects as go
+import plotly.io as pio
 import numpy as np
 
-st.set_page_config(page_title="Foundation Beam Analysis", layout="wide")
+# ParsedData lives in an importable module so cached results pickle by a stable
+# reference; the script itself runs as a fresh __main__ on every rerun
+from parsing import parse_all, interpolate_on_beams
 
-st.title("Foundation Beam Analysis Viewer")
-st.markdown("Upload your foundation analysis file to visualize ground stress and loads")
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = "orjson"
+except ImportError:  # fall back to plotly's default json encoder
+    pass
 
-# File uploader
-uploaded_file = st.file_uploader("Choose a .txt file", type=['txt'])
+# === HELPER FUNCTIONS ===
+def beam_positions_xy(beam_num, positions, balk_xyz, beam_lengths):
+    """Plan coordinates of positions (m) along a beam, or None when the beam can't be placed."""
+    if beam_num > len(balk_xyz):
+        return None
+    
+    if math.isnan(balk_xyz[beam_num - 1, 0, 0]) or beam_lengths[beam_num - 1] <= 0:
+        return None
+    
+    positions = np.asarray(positions, dtype=float)
+    beam_idx = np.full(len(positions), beam_num - 1)
+    return interpolate_on_beams(beam_idx, positions, beam_lengths, balk_xyz)
 
-if uploaded_file is not None:
-    # Read file with fallback encoding
-    def read_uploaded_file(file):
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'windows-1252']
-        
-        for encoding in encodings:
-            try:
-                file.seek(0)
-                content = file.read().decode(encoding)
-                lines = content.split('\n')
-                return lines
-            except UnicodeDecodeError:
-                continue
-        
-        # Last resort
-        try:
-            file.seek(0)
-            content = file.read().decode('utf-8', errors='ignore')
-            lines = content.split('\n')
-            return lines
-        except Exception as e:
-            st.error(f"Could not read file: {e}")
-            return []
+def sample_distributed_loads(dist):
+    """Arrow samples for a beam's (q1, q2, start, length) load rows, as flat (load_idx, positions, q) arrays."""
+    q1, q2 = np.abs(dist[:, 0]), np.abs(dist[:, 1])
+    start, length = dist[:, 2], dist[:, 3]
+    
+    # An arrow every 0.5 m, at least 3 per load, evenly spread from start to start + length
+    counts = np.maximum(3, (length / 0.5).astype(int))
+    load_idx = np.repeat(np.arange(len(dist)), counts)
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    frac = (np.arange(counts.sum()) - first) / (counts[load_idx] - 1)
+    
+    positions = start[load_idx] + frac * length[load_idx]
+    ratios = np.where(length[load_idx] > 0, frac, 0.0)
+    q_locals = q1[load_idx] + ratios * (q2[load_idx] - q1[load_idx])
+    return load_idx, positions, q_locals
+
+# === VISUALIZATION FUNCTIONS ===
+# Beams in the load case plots cycle through these colours
+_BEAM_COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57', '#FF9FF3', '#54A0FF', '#5F27CD', '#00D2D3']
+
+def load_case_label(bg_number):
+    """Display name of a load case, e.g. 'B.G:1 - Permanent'."""
+    return f"B.G:{bg_number} - {'Permanent' if bg_number == 1 else 'Variable'}"
 
-    lines = read_uploaded_file(uploaded_file)
+def node_trace(data, trace_type):
+    """Beam end node markers with their labels, as a 'scatter3d' or 'scattergl' trace dict."""
+    trace = dict(
+        type=trace_type,
+        x=data.node_xyz[:, 0],
+        y=data.node_xyz[:, 1],
+        mode='markers+text',
+        name='Beam Endpoints',
+        marker=dict(size=8, color='black', symbol='circle'),
+        text=data.node_labels,
+        textposition="top center",
+        textfont=dict(size=10),
+        hovertemplate='<b>Node: %{text}</b><br>X: %{x:.2f}m<br>Y: %{y:.2f}m<extra></extra>'
+    )
+    if trace_type == 'scatter3d':
+        trace['z'] = data.node_xyz[:, 2]
+    return trace
+
+def place_loads(data, bg_number):
+    """Plan positions of one load case's loads, shared by the 3D and Fast 2D builders.
+    
+    Returns a dict per load type ('point', 'distributed') of equal-length arrays: beam,
+    x, y, value (kN or kN/m), position (m) and labelled, which marks the first and last
+    sample of each distributed load (every point load is labelled).
+    """
+    fields = ('beam', 'x', 'y', 'value', 'position', 'labelled')
+    placed = {'point': [], 'distributed': []}
     
-    if lines:
-        stramienlijnen = {}
-        balken = []
-        ground_stress_data = {}
-        load_cases = {}
+    for beam_num, loads in data.load_cases[bg_number].items():
+        if beam_num > len(data.balken):
+            continue
         
-        # === PARSE STRAMIENLIJNEN ===
-        in_stramien = False
-        node_positions = {}  # Store specific node positions if defined
+        # Point loads of a beam are placed with one interpolation call
+        points = loads['point']
+        coords = beam_positions_xy(beam_num, points[:, 1], data.balk_xyz, data.beam_lengths) if len(points) else None
+        if coords is not None:
+            n = len(points)
+            placed['point'].append((np.full(n, beam_num), *coords, points[:, 0], points[:, 1], np.ones(n, dtype=bool)))
         
-        for line in lines:
-            if "STRAMIENLIJNEN" in line:
-                in_stramien = True
-                continue
-            if "BALKEN" in line:
-                break
-            if in_stramien:
-                match = re.match(r"\s*\d+\s+(\S+)\s+([\d.]+)\s+([\d.]+)\s+([\d.]+)\s+([\d.]+)", line)
-                if match:
-                    naam = match.group(1)
-                    x1 = float(match.group(2))
-                    y1 = float(match.group(3))
-                    x2 = float(match.group(4))
-                    y2 = float(match.group(5))
-                    stramienlijnen[naam] = [(x1, y1), (x2, y2)]
+        dist = loads['distributed']
+        coords = None
+        if len(dist):
+            load_idx, positions, q_locals = sample_distributed_loads(dist)
+            coords = beam_positions_xy(beam_num, positions, data.balk_xyz, data.beam_lengths)
+        if coords is not None:
+            labelled = np.ones(len(load_idx), dtype=bool)
+            labelled[1:-1] = (load_idx[1:-1] != load_idx[:-2]) | (load_idx[1:-1] != load_idx[2:])
+            placed['distributed'].append((np.full(len(positions), beam_num), *coords, q_locals, positions, labelled))
+    
+    return {
+        kind: dict(zip(fields, map(np.concatenate, zip(*rows)))) if rows else {name: np.empty(0) for name in fields}
+        for kind, rows in placed.items()
+    }
+
+def ground_stress_traces(file_bytes):
+    """Build the Ground Stress plot traces as plain dicts; they don't depend on the selected load case."""
+    data = parse_all(file_bytes)
+    traces = []
+    
+    # All beams go into one trace; None breaks the line between segments
+    struct_x, struct_y, struct_z = [], [], []
+    for (x0, y0), (x1, y1) in data.balk_xyz.tolist():
+        if math.isnan(x0):
+            continue
+        struct_x += [x0, x1, None]
+        struct_y += [y0, y1, None]
+        struct_z += [0.0, 0.0, None]
+    
+    if struct_x:
+        traces.append(dict(
+            type='scatter3d',
+            x=struct_x,
+            y=struct_y,
+            z=struct_z,
+            mode='lines',
+            name="Beam Structure",
+            line=dict(width=2, color='rgba(100,100,100,0.4)'),
+            connectgaps=False,
+            hoverinfo='skip'
+        ))
+    
+    if data.ground_stress_data.size:
+        z_min, z_max = float(data.ground_stress_data['stress'].min()), float(data.ground_stress_data['stress'].max())
         
-        # === PARSE BALKEN ===
-        in_balken = False
-        max_positions = {}  # Track max position for each stramienlijn
+        # Sort by beam, then by position along it, so each beam is one contiguous run;
+        # beams keep the order they first appear in the file
+        samples = data.ground_stress_data[np.lexsort((data.ground_stress_data['position'], data.ground_stress_data['beam']))]
+        beam_ids, starts, counts = np.unique(samples['beam'], return_index=True, return_counts=True)
+        first_seen = np.unique(data.ground_stress_data['beam'], return_index=True)[1]
         
-        for line in lines:
-            if "BALKEN" in line and "vervolg" not in line.lower():
-                in_balken = True
-                continue
-            if "BALKEN vervolg" in line or "DOORSNEDESECTOREN" in line:
-                break
-            if in_balken and line.strip():
-                match = re.match(r"\s*\d+\s+\S+\s+(\S+)\s+(\S+)", line)
-                if match:
-                    begin = match.group(1)
-                    eind = match.group(2)
-                    balken.append((begin, eind))
-                    
-                    # Track max positions for each line
-                    for coord in [begin, eind]:
-                        if ';' in coord:
-                            lijn_naam, pos_str = coord.split(';')
-                            pos = int(pos_str)
-                            if lijn_naam not in max_positions:
-                                max_positions[lijn_naam] = pos
-                            else:
-                                max_positions[lijn_naam] = max(max_positions[lijn_naam], pos)
+        # Stress surfaces are merged into one mesh (faces offset per beam),
+        # peak lines into one polyline with None separators
+        mesh_x, mesh_y, mesh_z, mesh_beam = [], [], [], []
+        faces_i, faces_j, faces_k = [], [], []
+        peak_x, peak_y, peak_z, peak_data = [], [], [], []
+        offset = 0
         
-        # === HELPER FUNCTIONS ===
-        def get_beam_coord(code):
-            lijn_naam, pos_str = code.split(';')
-            i = int(pos_str)
-            
-            if lijn_naam not in stramienlijnen:
-                raise ValueError(f"Stramienlijn {lijn_naam} niet gevonden")
-            
-            p1, p2 = stramienlijnen[lijn_naam]
-            
-            # Calculate the line length
-            line_length = ((p2[0] - p1[0])**2 + (p2[1] - p1[1])**2)**0.5
-            
-            # Assume positions are in meters along the line
-            # Position 1 might be at 0m, position 5 at some distance, etc.
-            # If max_positions is available, use that for interpolation
-            # Otherwise, treat position numbers as relative distances
-            
-            if lijn_naam in max_positions and max_positions[lijn_naam] > 1:
-                # Use max position to determine divisions
-                divisions = max_positions[lijn_naam] - 1
-                ratio = (i - 1) / divisions
-            else:
-                # Fallback: assume position number represents meters or equal divisions
-                # This needs to be adjusted based on your actual data format
-                ratio = (i - 1) / 3  # Default to 4 positions
-            
-            x = p1[0] + ratio * (p2[0] - p1[0])
-            y = p1[1] + ratio * (p2[1] - p1[1])
-            return (x, y)
+        for g in np.argsort(first_seen, kind='stable').tolist():
+            beam_num, n_points = int(beam_ids[g]), int(counts[g])
+            beam = samples[starts[g]:starts[g] + n_points]
+            x_sorted, y_sorted, z_sorted = beam['x'], beam['y'], beam['stress']
+            
+            mesh_x += [x_sorted, x_sorted]
+            mesh_y += [y_sorted, y_sorted]
+            mesh_z += [z_sorted, np.zeros(n_points)]
+            mesh_beam.append(np.full(2 * n_points, beam_num))
+            
+            # Two triangles per step between the stress line and its base
+            steps = offset + np.arange(n_points - 1)
+            faces_i.append(np.column_stack([steps + n_points, steps]).ravel())
+            faces_j.append(np.column_stack([steps, steps + 1]).ravel())
+            faces_k.append(np.repeat(steps + n_points + 1, 2))
+            offset += 2 * n_points
+            
+            peak_x += x_sorted.tolist() + [None]
+            peak_y += y_sorted.tolist() + [None]
+            peak_z += z_sorted.tolist() + [None]
+            peak_data += [[pos, stress, beam_num] for pos, stress in zip(beam['position'].tolist(), z_sorted.tolist())] + [[None, None, None]]
         
-        def get_beam_length(beam_num):
-            in_sections = False
-            for line in lines:
-                if "DOORSNEDESECTOREN" in line:
-                    in_sections = True
-                    continue
-                if in_sections and line.strip():
-                    match = re.match(rf"Balk\s+{beam_num}:\d+\s+([\d.]+)\s+([\d.]+)\s+([\d.]+)", line)
-                    if match:
-                        return float(match.group(3))
-            return 0
+        # Typed arrays serialize as compact binary blocks instead of boxed floats
+        mesh_z = np.concatenate(mesh_z).astype(np.float32)
+        traces.append(dict(
+            type='mesh3d',
+            x=np.concatenate(mesh_x).astype(np.float32),
+            y=np.concatenate(mesh_y).astype(np.float32),
+            z=mesh_z,
+            i=np.concatenate(faces_i).astype(np.int32),
+            j=np.concatenate(faces_j).astype(np.int32),
+            k=np.concatenate(faces_k).astype(np.int32),
+            intensity=mesh_z,
+            colorscale='Viridis',
+            cmin=z_min,
+            cmax=z_max,
+            name="Stress Surface",
+            showscale=True,
+            colorbar=dict(
+                title=dict(text="Ground Stress<br>(kN/m²)", font=dict(size=12)),
+                x=1.02,
+                thickness=15,
+                len=0.7
+            ),
+            opacity=0.85,
+            customdata=np.concatenate(mesh_beam).astype(np.int32),
+            hovertemplate='<b>Beam %{customdata}</b><br>' +
+                         'Ground Stress: %{z:.1f} kN/m²<br>' +
+                         'X: %{x:.1f}m, Y: %{y:.1f}m<extra></extra>'
+        ))
         
-        def get_coord_3d(code):
-            lijn_naam, pos_str = code.split(';')
-            i = int(pos_str)
-            
-            if lijn_naam not in stramienlijnen:
-                raise ValueError(f"Stramienlijn {lijn_naam} niet gevonden")
-            
-            p1, p2 = stramienlijnen[lijn_naam]
-            
-            # Use the max position for this line to determine the division
-            max_pos = max_positions.get(lijn_naam, 4)
-            divisions = max_pos - 1
-            
-            x = p1[0] + (i - 1) * (p2[0] - p1[0]) / divisions
-            y = p1[1] + (i - 1) * (p2[1] - p1[1]) / divisions
-            z = 0.0
-            
-            return (x, y, z)
-        
-        def get_beam_3d_coords(beam_num, position):
-            if beam_num > len(balken):
-                return None
-            
-            beam_start, beam_end = balken[beam_num - 1]
-            start_coord = get_beam_coord(beam_start)
-            end_coord = get_beam_coord(beam_end)
-            
-            beam_length = get_beam_length(beam_num)
-            if beam_length <= 0:
-                return None
-            
-            ratio = position / beam_length
-            x = start_coord[0] + ratio * (end_coord[0] - start_coord[0])
-            y = start_coord[1] + ratio * (end_coord[1] - start_coord[1])
-            
-            return (x, y, 0.0)
+        traces.append(dict(
+            type='scatter3d',
+            x=peak_x,
+            y=peak_y,
+            z=peak_z,
+            mode='lines',
+            name="Peak Line",
+            line=dict(width=3, color='rgba(0,0,0,0.6)'),
+            connectgaps=False,
+            hovertemplate='<b>Beam %{customdata[2]} Peak</b><br>' +
+                         'Position: %{customdata[0]:.2f}m<br>' +
+                         'Ground Stress: %{customdata[1]:.1f} kN/m²<br>' +
+                         'X: %{x:.1f}m, Y: %{y:.1f}m<extra></extra>',
+            customdata=peak_data
+        ))
+    
+    if data.node_labels:
+        traces.append(node_trace(data, 'scatter3d'))
+    
+    return traces
+
+def ground_stress_traces_2d(file_bytes):
+    """Plan-view Scattergl version of the Ground Stress traces for the Fast 2D render mode."""
+    data = parse_all(file_bytes)
+    traces = []
+    
+    struct_x, struct_y = [], []
+    for (x0, y0), (x1, y1) in data.balk_xyz.tolist():
+        if math.isnan(x0):
+            continue
+        struct_x += [x0, x1, None]
+        struct_y += [y0, y1, None]
+    
+    if struct_x:
+        traces.append(dict(
+            type='scattergl',
+            x=struct_x,
+            y=struct_y,
+            mode='lines',
+            name="Beam Structure",
+            line=dict(width=2, color='rgba(100,100,100,0.6)'),
+            connectgaps=False,
+            hoverinfo='skip'
+        ))
+    
+    if data.ground_stress_data.size:
+        # Stress is colour-encoded instead of drawn as height
+        traces.append(dict(
+            type='scattergl',
+            x=data.ground_stress_data['x'],
+            y=data.ground_stress_data['y'],
+            mode='markers',
+            name="Ground Stress",
+            marker=dict(
+                size=8,
+                color=data.ground_stress_data['stress'],
+                colorscale='Viridis',
+                showscale=True,
+                colorbar=dict(
+                    title=dict(text="Ground Stress<br>(kN/m²)", font=dict(size=12)),
+                    x=1.02,
+                    thickness=15,
+                    len=0.7
+                )
+            ),
+            customdata=np.column_stack([data.ground_stress_data[name] for name in ('beam', 'position', 'stress')]),
+            hovertemplate='<b>Beam %{customdata[0]}</b><br>' +
+                         'Position: %{customdata[1]:.2f}m<br>' +
+                         'Ground Stress: %{customdata[2]:.1f} kN/m²<br>' +
+                         'X: %{x:.1f}m, Y: %{y:.1f}m<extra></extra>'
+        ))
+    
+    if data.node_labels:
+        traces.append(node_trace(data, 'scattergl'))
+    
+    return traces
+
+def load_traces(file_bytes, bg_number):
+    """Build the 3D traces of one load case as plain dicts."""
+    data = parse_all(file_bytes)
+    traces = []
+    
+    # The whole skeleton is one trace: None breaks the line between beams and
+    # line.color gives each beam's vertices its own colour
+    skel_x, skel_y, skel_z, skel_beam, skel_color = [], [], [], [], []
+    for i, ((x0, y0), (x1, y1)) in enumerate(data.balk_xyz.tolist()):
+        if math.isnan(x0):
+            continue
         
-        # === PARSE LOAD CASES ===
-        def parse_load_cases():
-            in_loads_section = False
-            current_bg = None
-            current_beam = None
-            
-            for line in lines:
-                bg_match = re.match(r"VELDBELASTINGEN\s+B\.G:(\d+)", line)
-                if bg_match:
-                    current_bg = int(bg_match.group(1))
-                    if current_bg not in load_cases:
-                        load_cases[current_bg] = {}
-                    in_loads_section = True
-                    continue
-                
-                if in_loads_section and ("BELASTINGCOMBINATIES" in line or "REACTIES" in line):
-                    in_loads_section = False
-                    continue
-                
-                if in_loads_section and line.strip():
-                    beam_match = re.match(r"Balk\s+(\d+):", line)
-                    if beam_match:
-                        current_beam = int(beam_match.group(1))
-                        if current_beam not in load_cases[current_bg]:
-                            load_cases[current_bg][current_beam] = []
-                    
-                    q_match = re.match(r"Balk\s+\d+:\d+\s+\d+\s+1:q-last\s+([-\d.]+)\s+([-\d.]+)\s+([\d.]+)\s+([\d.]+)", line)
-                    if q_match and current_beam:
-                        q1 = float(q_match.group(1))
-                        q2 = float(q_match.group(2))
-                        distance = float(q_match.group(3))
-                        length = float(q_match.group(4))
-                        load_cases[current_bg][current_beam].append({
-                            'type': 'distributed',
-                            'q1': q1,
-                            'q2': q2,
-                            'start': distance,
-                            'length': length
-                        })
-                    
-                    p_match = re.match(r"Balk\s+\d+:\d+\s+\d+\s+8:Puntlast\s+([-\d.]+)\s+([\d.]+)", line)
-                    if p_match and current_beam:
-                        force = float(p_match.group(1))
-                        position = float(p_match.group(2))
-                        load_cases[current_bg][current_beam].append({
-                            'type': 'point',
-                            'force': force,
-                            'position': position
-                        })
+        color = _BEAM_COLORS[i % len(_BEAM_COLORS)]
+        skel_x += [x0, x1, None]
+        skel_y += [y0, y1, None]
+        skel_z += [0.0, 0.0, None]
+        skel_beam += [i + 1, i + 1, None]
+        skel_color += [color, color, color]
+    
+    if skel_x:
+        traces.append(dict(
+            type='scatter3d',
+            x=skel_x,
+            y=skel_y,
+            z=skel_z,
+            mode='lines',
+            line=dict(width=6, color=skel_color),
+            connectgaps=False,
+            customdata=skel_beam,
+            hovertemplate='<b>Beam %{customdata}</b><br>X: %{x:.2f}m<br>Y: %{y:.2f}m<extra></extra>'
+        ))
+    
+    arrow_scale = 0.05
+    placed = place_loads(data, bg_number)
+    arrow_heights = {
+        'point': np.abs(placed['point']['value']) * arrow_scale,
+        'distributed': placed['distributed']['value'] * arrow_scale * 2,
+    }
+    
+    # Arrows of one load type share a line trace (None separated), a cone trace and a label trace;
+    # customdata carries (beam, value, position) for the hover text
+    arrow_styles = {
+        'point': dict(color='red', width=8, label_size=12, unit='kN',
+                      hover='<b>Point Load</b><br>Beam %{customdata[0]}<br>Force: %{customdata[1]:.1f} kN'),
+        'distributed': dict(color='orange', width=4, label_size=10, unit='kN/m',
+                            hover='<b>Distributed Load</b><br>Beam %{customdata[0]}<br>q: %{customdata[1]:.1f} kN/m'),
+    }
+    for kind, style in arrow_styles.items():
+        loads, heights = placed[kind], arrow_heights[kind]
+        if not len(heights):
+            continue
         
-        parse_load_cases()
+        line_x, line_y, line_z, line_data, cone_data = [], [], [], [], []
+        label_x, label_y, label_z, label_text = [], [], [], []
+        rows = zip(*(loads[name].tolist() for name in ('beam', 'x', 'y', 'value', 'position', 'labelled')), heights.tolist())
+        for beam_num, x, y, value, position, labelled, arrow_height in rows:
+            hover = [beam_num, value, position]
+            line_x += [x, x, None]
+            line_y += [y, y, None]
+            line_z += [arrow_height, 0, None]
+            line_data += [hover, hover, [None, None, None]]
+            cone_data.append(hover)
+            if labelled:
+                label_x.append(x)
+                label_y.append(y)
+                label_z.append(arrow_height)
+                label_text.append(f"{value:.1f} {style['unit']}")
         
-        # === PARSE GROUND STRESS ===
-        def parse_ground_stress():
-            in_displacement_section = False
-            
-            for i, line in enumerate(lines):
-                if "TUSSENPUNTEN VERPLAATSINGEN" in line and "Fundamentele combinatie" in line:
-                    in_displacement_section = True
-                    continue
-                    
-                if in_displacement_section and ("REACTIES" in line or "BELASTINGCOMBINATIES" in line):
-                    break
-                    
-                if in_displacement_section and line.strip():
-                    match = re.match(r"\s*(\d+)\s+(\d+)\s+([\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([\d.]+)", line)
-                    if match:
-                        beam_num = int(match.group(1))
-                        position = float(match.group(3))
-                        ground_stress = float(match.group(8))
-                        
-                        if beam_num <= len(balken):
-                            beam_start, beam_end = balken[beam_num - 1]
-                            
-                            try:
-                                start_coord = get_beam_coord(beam_start)
-                                end_coord = get_beam_coord(beam_end)
-                                
-                                beam_length = get_beam_length(beam_num)
-                                if beam_length > 0:
-                                    ratio = position / beam_length
-                                    
-                                    x = start_coord[0] + ratio * (end_coord[0] - start_coord[0])
-                                    y = start_coord[1] + ratio * (end_coord[1] - start_coord[1])
-                                    
-                                    coord_key = f"Beam{beam_num}_Pos{position:.3f}"
-                                    ground_stress_data[coord_key] = {
-                                        'x': x, 'y': y, 'z': ground_stress,
-                                        'beam': beam_num, 'position': position,
-                                        'stress': ground_stress
-                                    }
-                            except:
-                                continue
+        traces.append(dict(
+            type='scatter3d',
+            x=line_x,
+            y=line_y,
+            z=line_z,
+            mode='lines',
+            line=dict(width=style['width'], color=style['color']),
+            connectgaps=False,
+            customdata=line_data,
+            hovertemplate=style['hover'] + '<br>Position: %{customdata[2]:.2f}m<extra></extra>'
+        ))
         
-        parse_ground_stress()
+        # The vector length is the arrow height; 'raw' sizing skips plotly's spacing-based
+        # rescaling, so every cone stays 0.3x its own arrow as when each had its own trace
+        zeros = np.zeros(len(heights))
+        traces.append(dict(
+            type='cone',
+            x=loads['x'],
+            y=loads['y'],
+            z=zeros,
+            u=zeros,
+            v=zeros,
+            w=-heights,
+            sizemode='raw',
+            sizeref=0.3,
+            colorscale=[[0, style['color']], [1, style['color']]],
+            showscale=False,
+            customdata=cone_data,
+            hovertemplate=style['hover'] + '<extra></extra>'
+        ))
         
-        # === VISUALIZATION FUNCTIONS ===
-        def create_ground_stress_plot():
-            fig = go.Figure()
-            
-            beam_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57', '#FF9FF3', '#54A0FF', '#5F27CD', '#00D2D3']
-            
-            for i, (b_start, b_end) in enumerate(balken):
-                try:
-                    x0, y0, z0 = get_coord_3d(b_start)
-                    x1, y1, z1 = get_coord_3d(b_end)
-                    
-                    fig.add_trace(go.Scatter3d(
-                        x=[x0, x1],
-                        y=[y0, y1],
-                        z=[z0, z1],
-                        mode='lines',
-                        name=f"Beam {i+1} Structure",
-                        line=dict(width=2, color='rgba(100,100,100,0.4)'),
-                        showlegend=True,
-                        hoverinfo='skip'
-                    ))
-                except Exception as e:
-                    pass
-            
-            if ground_stress_data:
-                beams_data = {}
-                for key, data in ground_stress_data.items():
-                    beam_num = data['beam']
-                    if beam_num not in beams_data:
-                        beams_data[beam_num] = {'x': [], 'y': [], 'z': [], 'stress': [], 'pos': []}
-                    beams_data[beam_num]['x'].append(data['x'])
-                    beams_data[beam_num]['y'].append(data['y'])
-                    beams_data[beam_num]['z'].append(data['z'])
-                    beams_data[beam_num]['stress'].append(data['stress'])
-                    beams_data[beam_num]['pos'].append(data['position'])
-                
-                all_z_values = []
-                for data in beams_data.values():
-                    all_z_values.extend(data['z'])
-                z_min, z_max = min(all_z_values), max(all_z_values)
-                
-                for beam_num, data in beams_data.items():
-                    sorted_indices = sorted(range(len(data['pos'])), key=lambda i: data['pos'][i])
-                    x_sorted = [data['x'][i] for i in sorted_indices]
-                    y_sorted = [data['y'][i] for i in sorted_indices]
-                    z_sorted = [data['z'][i] for i in sorted_indices]
-                    stress_sorted = [data['stress'][i] for i in sorted_indices]
-                    pos_sorted = [data['pos'][i] for i in sorted_indices]
-                    
-                    n_points = len(x_sorted)
-                    vertices_x = x_sorted + x_sorted
-                    vertices_y = y_sorted + y_sorted
-                    vertices_z = z_sorted + [0] * n_points
-                    
-                    faces = []
-                    for i in range(n_points - 1):
-                        faces.append([i + n_points, i, i + n_points + 1])
-                        faces.append([i, i + 1, i + n_points + 1])
-                    
-                    fig.add_trace(go.Mesh3d(
-                        x=vertices_x,
-                        y=vertices_y,
-                        z=vertices_z,
-                        i=[face[0] for face in faces],
-                        j=[face[1] for face in faces], 
-                        k=[face[2] for face in faces],
-                        intensity=z_sorted + [0] * n_points,
-                        colorscale='Viridis',
-                        cmin=z_min,
-                        cmax=z_max,
-                        name=f"Beam {beam_num} Stress Surface",
-                        showscale=True if beam_num == 1 else False,
-                        colorbar=dict(
-                            title=dict(text="Ground Stress<br>(kN/m²)", font=dict(size=12)),
-                            x=1.02,
-                            thickness=15,
-                            len=0.7
-                        ),
-                        opacity=0.85,
-                        showlegend=True,
-                        hovertemplate=f'<b>Beam {beam_num}</b><br>' +
-                                     'Ground Stress: %{z:.1f} kN/m²<br>' +
-                                     'X: %{x:.1f}m, Y: %{y:.1f}m<extra></extra>'
-                    ))
-                    
-                    fig.add_trace(go.Scatter3d(
-                        x=x_sorted,
-                        y=y_sorted,
-                        z=z_sorted,
-                        mode='lines',
-                        name=f"Beam {beam_num} Peak Line",
-                        line=dict(width=3, color='rgba(0,0,0,0.6)'),
-                        showlegend=True,
-                        hovertemplate=f'<b>Beam {beam_num} Peak</b><br>' +
-                                     'Position: %{customdata[0]:.2f}m<br>' +
-                                     'Ground Stress: %{customdata[1]:.1f} kN/m²<br>' +
-                                     'X: %{x:.1f}m, Y: %{y:.1f}m<extra></extra>',
-                        customdata=list(zip(pos_sorted, stress_sorted))
-                    ))
-            
-            unique_points = set()
-            for b_start, b_end in balken:
-                unique_points.add(b_start)
-                unique_points.add(b_end)
-            
-            node_x, node_y, node_z, node_labels = [], [], [], []
-            for point in sorted(unique_points):
-                try:
-                    x, y, z = get_coord_3d(point)
-                    node_x.append(x)
-                    node_y.append(y) 
-                    node_z.append(z)
-                    node_labels.append(point)
-                except Exception as e:
-                    pass
-            
-            if node_x:
-                fig.add_trace(go.Scatter3d(
-                    x=node_x,
-                    y=node_y,
-                    z=node_z,
-                    mode='markers+text',
-                    name='Beam Endpoints',
-                    marker=dict(size=8, color='black', symbol='circle'),
-                    text=node_labels,
-                    textposition="top center",
-                    textfont=dict(size=10),
-                    hovertemplate='<b>Node: %{text}</b><br>' +
-                                 'X: %{x:.2f}m<br>' +
-                                 'Y: %{y:.2f}m<extra></extra>'
-                ))
-            
-            fig.update_layout(
-                title=dict(
-                    text="Ground Stress Distribution",
-                    x=0.5,
-                    font=dict(size=20, color='black')
-                ),
-                scene=dict(
-                    xaxis=dict(title="X (m)", showgrid=False, showline=False, zeroline=False, showticklabels=True, backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(0,0,0,0)'),
-                    yaxis=dict(title="Y (m)", showgrid=False, showline=False, zeroline=False, showticklabels=True, backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(0,0,0,0)'),
-                    zaxis=dict(title="Ground Stress (kN/m²)", showgrid=False, showline=False, zeroline=False, showticklabels=True, backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(0,0,0,0)'),
-                    bgcolor='rgba(0,0,0,0)',
-                    aspectmode='manual',
-                    aspectratio=dict(x=1, y=1, z=0.8),
-                    camera=dict(eye=dict(x=1.3, y=1.3, z=1.5))
-                ),
-                showlegend=False,
-                margin=dict(l=0, r=0, t=60, b=0),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                autosize=True,
-                height=700
-            )
-            
-            return fig
+        traces.append(dict(
+            type='scatter3d',
+            x=label_x,
+            y=label_y,
+            z=label_z,
+            mode='text',
+            text=label_text,
+            textposition="top center",
+            textfont=dict(size=style['label_size'], color=style['color'], family='Arial Black'),
+            hoverinfo='skip'
+        ))
+    
+    if data.node_labels:
+        traces.append(node_trace(data, 'scatter3d'))
+    
+    return traces
+
+def load_traces_2d(file_bytes, bg_number):
+    """Plan-view Scattergl version of the load case traces for the Fast 2D render mode."""
+    data = parse_all(file_bytes)
+    traces = []
+    
+    # One trace per colour; None breaks the line between segments
+    color_segments = {}
+    for i, ((x0, y0), (x1, y1)) in enumerate(data.balk_xyz.tolist()):
+        if math.isnan(x0):
+            continue
         
-        def create_loads_plot(bg_number):
-            if bg_number not in load_cases:
-                return None
-            
-            fig = go.Figure()
-            beam_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57', '#FF9FF3', '#54A0FF', '#5F27CD', '#00D2D3']
-            
-            for i, (b_start, b_end) in enumerate(balken):
-                try:
-                    x0, y0, z0 = get_coord_3d(b_start)
-                    x1, y1, z1 = get_coord_3d(b_end)
-                    
-                    color = beam_colors[i % len(beam_colors)]
-                    
-                    fig.add_trace(go.Scatter3d(
-                        x=[x0, x1],
-                        y=[y0, y1],
-                        z=[z0, z1],
-                        mode='lines',
-                        name=f"Beam {i+1}",
-                        line=dict(width=6, color=color),
-                        showlegend=False,
-                        hovertemplate=f'<b>Beam {i+1}</b><br>X: %{{x:.2f}}m<br>Y: %{{y:.2f}}m<extra></extra>'
-                    ))
-                except Exception as e:
-                    pass
-            
-            arrow_scale = 0.05
-            
-            for beam_num, loads in load_cases[bg_number].items():
-                if beam_num > len(balken):
-                    continue
-                
-                beam_length = get_beam_length(beam_num)
-                color = beam_colors[(beam_num-1) % len(beam_colors)]
-                
-                for load in loads:
-                    if load['type'] == 'point':
-                        coords = get_beam_3d_coords(beam_num, load['position'])
-                        if coords:
-                            x, y, z = coords
-                            force_magnitude = abs(load['force'])
-                            arrow_height = force_magnitude * arrow_scale
-                            
-                            fig.add_trace(go.Scatter3d(
-                                x=[x, x],
-                                y=[y, y],
-                                z=[arrow_height, 0],
-                                mode='lines',
-                                line=dict(width=8, color='red'),
-                                showlegend=False,
-                                hovertemplate=f'<b>Point Load</b><br>Beam {beam_num}<br>' +
-                                             f'Force: {load["force"]:.1f} kN<br>' +
-                                             f'Position: {load["position"]:.2f}m<extra></extra>'
-                            ))
-                            
-                            fig.add_trace(go.Cone(
-                                x=[x],
-                                y=[y],
-                                z=[0],
-                                u=[0],
-                                v=[0],
-                                w=[-1],
-                                sizemode='absolute',
-                                sizeref=arrow_height * 0.3,
-                                colorscale=[[0, 'red'], [1, 'red']],
-                                showscale=False,
-                                showlegend=False,
-                                hovertemplate=f'<b>Point Load</b><br>Beam {beam_num}<br>' +
-                                             f'Force: {load["force"]:.1f} kN<extra></extra>'
-                            ))
-                            
-                            fig.add_trace(go.Scatter3d(
-                                x=[x],
-                                y=[y],
-                                z=[arrow_height],
-                                mode='text',
-                                text=[f"{load['force']:.1f} kN"],
-                                textposition="top center",
-                                textfont=dict(size=12, color='red', family='Arial Black'),
-                                showlegend=False,
-                                hoverinfo='skip'
-                            ))
-                    
-                    elif load['type'] == 'distributed':
-                        start_pos = load['start']
-                        end_pos = start_pos + load['length']
-                        
-                        n_arrows = max(3, int(load['length'] / 0.5))
-                        positions = np.linspace(start_pos, end_pos, n_arrows)
-                        
-                        for i, pos in enumerate(positions):
-                            coords = get_beam_3d_coords(beam_num, pos)
-                            if coords:
-                                x, y, z = coords
-                                
-                                ratio = (pos - start_pos) / load['length'] if load['length'] > 0 else 0
-                                q_local = abs(load['q1']) + ratio * (abs(load['q2']) - abs(load['q1']))
-                                arrow_height = q_local * arrow_scale * 2
-                                
-                                fig.add_trace(go.Scatter3d(
-                                    x=[x, x],
-                                    y=[y, y],
-                                    z=[arrow_height, 0],
-                                    mode='lines',
-                                    line=dict(width=4, color='orange'),
-                                    showlegend=False,
-                                    hovertemplate=f'<b>Distributed Load</b><br>Beam {beam_num}<br>' +
-                                                 f'q: {q_local:.1f} kN/m<br>' +
-                                                 f'Position: {pos:.2f}m<extra></extra>'
-                                ))
-                                
-                                fig.add_trace(go.Cone(
-                                    x=[x],
-                                    y=[y],
-                                    z=[0],
-                                    u=[0],
-                                    v=[0],
-                                    w=[-1],
-                                    sizemode='absolute',
-                                    sizeref=arrow_height * 0.3,
-                                    colorscale=[[0, 'orange'], [1, 'orange']],
-                                    showscale=False,
-                                    showlegend=False,
-                                    hovertemplate=f'<b>Distributed Load</b><br>Beam {beam_num}<br>' +
-                                                 f'q: {q_local:.1f} kN/m<extra></extra>'
-                                ))
-                                
-                                if i == 0 or i == len(positions) - 1:
-                                    fig.add_trace(go.Scatter3d(
-                                        x=[x],
-                                        y=[y],
-                                        z=[arrow_height],
-                                        mode='text',
-                                        text=[f"{q_local:.1f} kN/m"],
-                                        textposition="top center",
-                                        textfont=dict(size=10, color='orange', family='Arial Black'),
-                                        showlegend=False,
-                                        hoverinfo='skip'
-                                    ))
-            
-            unique_points = set()
-            for b_start, b_end in balken:
-                unique_points.add(b_start)
-                unique_points.add(b_end)
-            
-            node_x, node_y, node_z, node_labels = [], [], [], []
-            for point in sorted(unique_points):
-                try:
-                    x, y, z = get_coord_3d(point)
-                    node_x.append(x)
-                    node_y.append(y) 
-                    node_z.append(z)
-                    node_labels.append(point)
-                except Exception as e:
-                    pass
-            
-            if node_x:
-                fig.add_trace(go.Scatter3d(
-                    x=node_x,
-                    y=node_y,
-                    z=node_z,
-                    mode='markers+text',
-                    marker=dict(size=8, color='black', symbol='circle'),
-                    text=node_labels,
-                    textposition="top center",
-                    textfont=dict(size=10),
-                    showlegend=False,
-                    hovertemplate='<b>Node: %{text}</b><br>X: %{x:.2f}m<br>Y: %{y:.2f}m<extra></extra>'
-                ))
-            
-            load_case_name = "Permanent" if bg_number == 1 else "Variable"
-            fig.update_layout(
-                title=dict(
-                    text=f"Load Case B.G:{bg_number} - {load_case_name}",
-                    x=0.5,
-                    font=dict(size=20, color='black')
-                ),
-                scene=dict(
-                    xaxis=dict(title="X (m)", showgrid=True, gridcolor='rgba(200,200,200,0.3)', showline=True, zeroline=False, showticklabels=True),
-                    yaxis=dict(title="Y (m)", showgrid=True, gridcolor='rgba(200,200,200,0.3)', showline=True, zeroline=False, showticklabels=True),
-                    zaxis=dict(title="Load (kN or kN/m)", showgrid=True, gridcolor='rgba(200,200,200,0.3)', showline=True, zeroline=False, showticklabels=True),
-                    bgcolor='rgba(240,240,240,1)',
-                    aspectmode='manual',
-                    aspectratio=dict(x=1, y=1, z=0.6),
-                    camera=dict(eye=dict(x=1.5, y=1.5, z=1.2))
-                ),
-                showlegend=False,
-                margin=dict(l=0, r=0, t=60, b=0),
-                paper_bgcolor='white',
-                autosize=True,
-                height=700
-            )
-            
-            return fig
+        color = _BEAM_COLORS[i % len(_BEAM_COLORS)]
+        seg = color_segments.setdefault(color, {'x': [], 'y': [], 'beam': []})
+        seg['x'] += [x0, x1, None]
+        seg['y'] += [y0, y1, None]
+        seg['beam'] += [i + 1, i + 1, None]
+    
+    for color, seg in color_segments.items():
+        traces.append(dict(
+            type='scattergl',
+            x=seg['x'],
+            y=seg['y'],
+            mode='lines',
+            line=dict(width=4, color=color),
+            connectgaps=False,
+            customdata=seg['beam'],
+            hovertemplate='<b>Beam %{customdata}</b><br>X: %{x:.2f}m<br>Y: %{y:.2f}m<extra></extra>'
+        ))
+    
+    # Loads become markers at their application points, magnitude in the hover text
+    placed = place_loads(data, bg_number)
+    
+    dist = placed['distributed']
+    if len(dist['x']):
+        traces.append(dict(
+            type='scattergl',
+            x=dist['x'],
+            y=dist['y'],
+            mode='markers',
+            marker=dict(size=6, color='orange'),
+            text=[f"Beam {beam_num}<br>q: {q:.1f} kN/m<br>Position: {pos:.2f}m"
+                  for beam_num, q, pos in zip(dist['beam'].tolist(), dist['value'].tolist(), dist['position'].tolist())],
+            hovertemplate='<b>Distributed Load</b><br>%{text}<extra></extra>'
+        ))
+    
+    points = placed['point']
+    if len(points['x']):
+        traces.append(dict(
+            type='scattergl',
+            x=points['x'],
+            y=points['y'],
+            mode='markers',
+            marker=dict(size=12, color='red', symbol='triangle-down'),
+            text=[f"Beam {beam_num}<br>Force: {force:.1f} kN<br>Position: {position:.2f}m"
+                  for beam_num, force, position in zip(points['beam'].tolist(), points['value'].tolist(), points['position'].tolist())],
+            hovertemplate='<b>Point Load</b><br>%{text}<extra></extra>'
+        ))
+    
+    if data.node_labels:
+        traces.append(node_trace(data, 'scattergl'))
+    
+    return traces
+
+def layout_2d(title):
+    """Shared plan-view layout for the Fast 2D render mode."""
+    return dict(
+        title=dict(
+            text=title,
+            x=0.5,
+            font=dict(size=20, color='black')
+        ),
+        xaxis=dict(title="X (m)", showgrid=True, gridcolor='rgba(200,200,200,0.3)', zeroline=False),
+        yaxis=dict(title="Y (m)", showgrid=True, gridcolor='rgba(200,200,200,0.3)', zeroline=False, scaleanchor='x', scaleratio=1),
+        showlegend=False,
+        margin=dict(l=0, r=0, t=60, b=0),
+        paper_bgcolor='white',
+        plot_bgcolor='white',
+        autosize=True,
+        height=700
+    )
+
+@st.cache_resource(max_entries=4)
+def ground_stress_figure(_file_bytes, file_hash):
+    """Cached 3D ground stress figure, keyed on the file hash."""
+    fig = go.Figure(data=ground_stress_traces(_file_bytes))
+    
+    fig.update_layout(
+        title=dict(
+            text="Ground Stress Distribution",
+            x=0.5,
+            font=dict(size=20, color='black')
+        ),
+        scene=dict(
+            xaxis=dict(title="X (m)", showgrid=False, showline=False, zeroline=False, showticklabels=True, backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(0,0,0,0)'),
+            yaxis=dict(title="Y (m)", showgrid=False, showline=False, zeroline=False, showticklabels=True, backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(0,0,0,0)'),
+            zaxis=dict(title="Ground Stress (kN/m²)", showgrid=False, showline=False, zeroline=False, showticklabels=True, backgroundcolor='rgba(0,0,0,0)', gridcolor='rgba(0,0,0,0)'),
+            bgcolor='rgba(0,0,0,0)',
+            aspectmode='manual',
+            aspectratio=dict(x=1, y=1, z=0.8),
+            camera=dict(eye=dict(x=1.3, y=1.3, z=1.5))
+        ),
+        showlegend=False,
+        margin=dict(l=0, r=0, t=60, b=0),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        autosize=True,
+        height=700
+    )
+    
+    return fig
+
+@st.cache_resource(max_entries=4)
+def ground_stress_figure_2d(_file_bytes, file_hash):
+    """Cached plan-view ground stress figure, keyed on the file hash."""
+    fig = go.Figure(data=ground_stress_traces_2d(_file_bytes))
+    fig.update_layout(**layout_2d("Ground Stress Distribution"))
+    return fig
+
+@st.cache_resource(max_entries=8)
+def loads_figure(_file_bytes, file_hash, bg_number):
+    """Cached 3D load case figure, keyed on the file hash and B.G number."""
+    if bg_number not in parse_all(_file_bytes).load_cases:
+        return None
+    
+    fig = go.Figure(data=load_traces(_file_bytes, bg_number))
+    fig.update_layout(
+        title=dict(
+            text=f"Load Case {load_case_label(bg_number)}",
+            x=0.5,
+            font=dict(size=20, color='black')
+        ),
+        scene=dict(
+            xaxis=dict(title="X (m)", showgrid=True, gridcolor='rgba(200,200,200,0.3)', showline=True, zeroline=False, showticklabels=True),
+            yaxis=dict(title="Y (m)", showgrid=True, gridcolor='rgba(200,200,200,0.3)', showline=True, zeroline=False, showticklabels=True),
+            zaxis=dict(title="Load (kN or kN/m)", showgrid=True, gridcolor='rgba(200,200,200,0.3)', showline=True, zeroline=False, showticklabels=True),
+            bgcolor='rgba(240,240,240,1)',
+            aspectmode='manual',
+            aspectratio=dict(x=1, y=1, z=0.6),
+            camera=dict(eye=dict(x=1.5, y=1.5, z=1.2))
+        ),
+        showlegend=False,
+        margin=dict(l=0, r=0, t=60, b=0),
+        paper_bgcolor='white',
+        autosize=True,
+        height=700
+    )
+    
+    return fig
+
+@st.cache_resource(max_entries=8)
+def loads_figure_2d(_file_bytes, file_hash, bg_number):
+    """Cached plan-view load case figure, keyed on the file hash and B.G number."""
+    if bg_number not in parse_all(_file_bytes).load_cases:
+        return None
+    
+    fig = go.Figure(data=load_traces_2d(_file_bytes, bg_number))
+    fig.update_layout(**layout_2d(f"Load Case {load_case_label(bg_number)}"))
+    
+    return fig
+
+st.set_page_config(page_title="Foundation Beam Analysis", layout="wide")
+
+st.title("Foundation Beam Analysis Viewer")
+st.markdown("Upload your foundation analysis file to visualize ground stress and loads")
+
+# File uploader
+uploaded_file = st.file_uploader("Choose a .txt file", type=['txt'])
+
+if uploaded_file is not None:
+    file_bytes = uploaded_file.getvalue()
+    parsed = parse_all(file_bytes)
+    # One more pass over the bytes (parse_all already hashed them); the figure caches
+    # key on this digest so they don't hash the whole upload again on every call
+    file_hash = hashlib.sha256(file_bytes).hexdigest()
+    
+    if parsed is not None:
         
         # === STREAMLIT UI ===
         st.success(f"✅ File loaded successfully!")
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Grid Lines", len(stramienlijnen))
+            st.metric("Grid Lines", len(parsed.stramienlijnen))
         with col2:
-            st.metric("Beams", len(balken))
+            st.metric("Beams", len(parsed.balken))
         with col3:
-            st.metric("Load Cases", len(load_cases))
+            st.metric("Load Cases", len(parsed.load_cases))
         
         st.markdown("---")
         
-        # Tabs for different views
-        tabs = st.tabs(["Ground Stress"] + [f"Load Case B.G:{bg}" for bg in sorted(load_cases.keys())])
+        # Fast 2D draws a WebGL plan view, much lighter than the 3D scenes on big foundations
+        render_mode = st.radio("Render mode", ["3D", "Fast 2D"], horizontal=True)
+        fast_2d = render_mode == "Fast 2D"
+        
+        # Tabs for different views; only the selected load case is built and rendered
+        tab_stress, tab_loads = st.tabs(["Ground Stress", "Load Cases"])
         
-        with tabs[0]:
+        with tab_stress:
             st.subheader("Ground Stress Distribution")
-            if ground_stress_data:
-                fig_stress = create_ground_stress_plot()
+            if parsed.ground_stress_data.size:
+                fig_stress = ground_stress_figure_2d(file_bytes, file_hash) if fast_2d else ground_stress_figure(file_bytes, file_hash)
                 st.plotly_chart(fig_stress, use_container_width=True)
             else:
                 st.warning("No ground stress data found in the file.")
         
-        for idx, bg_num in enumerate(sorted(load_cases.keys())):
-            with tabs[idx + 1]:
-                load_case_name = "Permanent" if bg_num == 1 else "Variable"
-                st.subheader(f"Load Case B.G:{bg_num} - {load_case_name}")
+        with tab_loads:
+            if parsed.load_cases:
+                bg_num = st.selectbox(
+                    "Load case",
+                    sorted(parsed.load_cases.keys()),
+                    format_func=load_case_label
+                )
+                st.subheader(f"Load Case {load_case_label(bg_num)}")
                 
                 # Show summary statistics
-                total_point_loads = sum(1 for beam_loads in load_cases[bg_num].values() 
-                                       for load in beam_loads if load['type'] == 'point')
-                total_distributed = sum(1 for beam_loads in load_cases[bg_num].values() 
-                                       for load in beam_loads if load['type'] == 'distributed')
+                total_point_loads = sum(len(beam_loads['point']) for beam_loads in parsed.load_cases[bg_num].values())
+                total_distributed = sum(len(beam_loads['distributed']) for beam_loads in parsed.load_cases[bg_num].values())
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -660,11 +617,13 @@ if uploaded_file is not None:
                 with col2:
                     st.metric("Distributed Loads", total_distributed)
                 
-                fig_loads = create_loads_plot(bg_num)
+                fig_loads = loads_figure_2d(file_bytes, file_hash, bg_num) if fast_2d else loads_figure(file_bytes, file_hash, bg_num)
                 if fig_loads:
                     st.plotly_chart(fig_loads, use_container_width=True)
                 else:
                     st.warning(f"No load data found for B.G:{bg_num}")
+            else:
+                st.warning("No load cases found in the file.")
 
 else:
     st.info("👆 Please upload a foundation analysis file to begin")
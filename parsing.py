@@ -0,0 +1,378 @@
+import streamlit as st
+import codecs
+import io
+import re
+from dataclasses import dataclass
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels below run as plain NumPy without it
+    njit = None
+
+try:
+    from charset_normalizer import from_bytes as detect_charset
+except ImportError:  # without a detector the encodings are tried in order
+    detect_charset = None
+
+# === REGEX PATTERNS ===
+_VLD_HDR_RE = re.compile(r"VELDBELASTINGEN\s+B\.G:(\d+)")
+_GS_RE = re.compile(r"\s*(\d+)\s+(\d+)\s+([\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([\d.]+)")
+
+# One ground stress sample per row, stored column-wise
+_GS_DTYPE = np.dtype([('beam', np.int64), ('position', float), ('stress', float), ('x', float), ('y', float)])
+
+# Parser states for the single-pass section scan
+_SEC_NONE, _SEC_STRAM, _SEC_BALK, _SEC_SECTIONS, _SEC_LOAD, _SEC_GS = range(6)
+
+# Lines starting with one of these open or close a section
+_SECTION_TOKENS = ("STRAMIENLIJNEN", "BALKEN", "DOORSNEDESECTOREN", "VELDBELASTINGEN",
+                   "TUSSENPUNTEN", "BELASTINGCOMBINATIES", "REACTIES")
+
+
+# === FILE READING ===
+def read_lines(file_bytes, spans=None):
+    """Open the upload (or just its spans) as a lazy line stream, detecting the encoding from the first 64 KiB."""
+    # The encodings these exports use; latin-1 decodes any byte sequence, so it comes last
+    encodings = ['utf-8', 'cp1252', 'latin-1']
+    sample = file_bytes[:65536]
+    if spans is not None:
+        file_bytes = b"".join(file_bytes[start:end] for start, end in spans)
+    
+    if detect_charset is not None:
+        # Restricted to that list; an open guess mislabels the ² in units
+        best = detect_charset(sample, cp_isolation=encodings).best()
+        if best is not None:
+            return io.TextIOWrapper(io.BytesIO(file_bytes), encoding=best.encoding, errors='replace')
+    
+    for encoding in encodings:
+        try:
+            # Incremental decode, so a multi-byte character cut off at the sample edge isn't an error
+            codecs.getincrementaldecoder(encoding)().decode(sample)
+        except UnicodeDecodeError:
+            continue
+        return io.TextIOWrapper(io.BytesIO(file_bytes), encoding=encoding, errors='replace')
+    
+    # Last resort
+    return io.TextIOWrapper(io.BytesIO(file_bytes), encoding='utf-8', errors='ignore')
+
+def next_section(header, section, opened):
+    """Parser state after a section header line, given the state before it.
+    
+    Shared by section_spans and parse_all so both follow the same sections. opened collects
+    the sections that are only read once (first STRAMIENLIJNEN, BALKEN and ground stress
+    table) and is updated in place.
+    """
+    if section == _SEC_GS and not header.startswith(("REACTIES", "BELASTINGCOMBINATIES")):
+        # The displacement table runs on to REACTIES or BELASTINGCOMBINATIES; its page headers repeat
+        return _SEC_GS
+    if header.startswith("VELDBELASTINGEN"):
+        # A line without a B.G continues the current load case
+        return _SEC_LOAD if _VLD_HDR_RE.match(header) or section == _SEC_LOAD else _SEC_NONE
+    if header.startswith("DOORSNEDESECTOREN"):
+        return _SEC_SECTIONS
+    
+    if header.startswith("STRAMIENLIJNEN"):
+        new_section = _SEC_STRAM
+    elif header.startswith("BALKEN vervolg"):
+        return _SEC_NONE
+    elif header.startswith("BALKEN"):
+        new_section = _SEC_BALK
+    elif header.startswith("TUSSENPUNTEN VERPLAATSINGEN") and "Fundamentele combinatie" in header:
+        new_section = _SEC_GS
+    else:
+        return _SEC_NONE
+    
+    if new_section in opened:
+        return _SEC_NONE
+    opened.add(new_section)
+    return new_section
+
+def section_spans(file_bytes):
+    """Byte ranges parse_all needs to see, found by searching the raw upload for headers.
+    
+    Every header line is kept so the parser passes through the same states, but the lines
+    under a header the parser would skip (reactions, combinations, other displacement
+    tables, repeated sections) are left out so they are never decoded or split into lines.
+    """
+    # bytes.find per token runs at memchr speed; a hit counts if only whitespace precedes it on its line
+    headers = []
+    for token in _SECTION_TOKENS:
+        token = token.encode()
+        pos = file_bytes.find(token)
+        while pos != -1:
+            line_start = file_bytes.rfind(b"\n", 0, pos) + 1
+            if not file_bytes[line_start:pos].strip():
+                line_end = file_bytes.find(b"\n", pos)
+                body_start = line_end + 1 if line_end != -1 else len(file_bytes)
+                headers.append((line_start, body_start, file_bytes[pos:body_start].decode('latin-1')))
+            pos = file_bytes.find(token, pos + 1)
+    headers.sort()
+    if not headers:
+        return None  # Nothing recognised (e.g. bare CR line ends); let the parser see every line
+    
+    spans = []
+    section = _SEC_NONE
+    opened = set()
+    for n, (start, body_start, header) in enumerate(headers):
+        section = next_section(header, section, opened)
+        end = headers[n + 1][0] if n + 1 < len(headers) else len(file_bytes)
+        spans.append((start, end if section != _SEC_NONE else body_start))
+    
+    return spans
+
+# === HELPER FUNCTIONS ===
+def resolve_nodes(codes, stramienlijnen, max_positions):
+    """Plan coordinates of 'LINE;POS' node codes as an (n, 2) array, NaN where the grid line is unknown."""
+    names = list(stramienlijnen)
+    line_ends = np.array([stramienlijnen[name] for name in names], dtype=float).reshape(-1, 2, 2)
+    line_index = {name: i for i, name in enumerate(names)}
+    
+    # Only the code strings need Python; the interpolation runs on whole arrays
+    lines = np.full(len(codes), -1)
+    positions = np.zeros(len(codes))
+    divisions = np.full(len(codes), 3.0)  # Default to 4 positions when the line's extent is unknown
+    for n, code in enumerate(codes):
+        lijn_naam, sep, pos_str = code.partition(';')
+        if not sep or lijn_naam not in line_index:
+            continue
+        lines[n] = line_index[lijn_naam]
+        positions[n] = int(pos_str)
+        if max_positions.get(lijn_naam, 0) > 1:
+            # Use max position to determine divisions
+            divisions[n] = max_positions[lijn_naam] - 1
+    
+    node_xy = np.full((len(codes), 2), np.nan)
+    known = lines >= 0
+    p1, p2 = line_ends[lines[known], 0], line_ends[lines[known], 1]
+    ratio = ((positions[known] - 1) / divisions[known])[:, None]
+    node_xy[known] = p1 + ratio * (p2 - p1)
+    return node_xy
+
+def _interpolate_on_beams_numpy(beam_idx, positions, lengths, balk_xyz):
+    """Plan coordinates of each position (m) along beam beam_idx, from the balk_xyz endpoint table."""
+    ratios = positions / lengths[beam_idx]
+    xs = balk_xyz[beam_idx, 0, 0] + ratios * (balk_xyz[beam_idx, 1, 0] - balk_xyz[beam_idx, 0, 0])
+    ys = balk_xyz[beam_idx, 0, 1] + ratios * (balk_xyz[beam_idx, 1, 1] - balk_xyz[beam_idx, 0, 1])
+    return xs, ys
+
+def _interpolate_on_beams_loop(beam_idx, positions, lengths, balk_xyz):
+    """Per-sample loop form of the same interpolation, for numba to compile."""
+    xs = np.empty(positions.size)
+    ys = np.empty(positions.size)
+    for n in range(positions.size):
+        b = beam_idx[n]
+        ratio = positions[n] / lengths[b]
+        xs[n] = balk_xyz[b, 0, 0] + ratio * (balk_xyz[b, 1, 0] - balk_xyz[b, 0, 0])
+        ys[n] = balk_xyz[b, 0, 1] + ratio * (balk_xyz[b, 1, 1] - balk_xyz[b, 0, 1])
+    return xs, ys
+
+# The loop only pays off compiled; plain Python runs the vectorized form instead.
+# Serial on purpose: Streamlit sessions run in parallel threads, which numba's default
+# workqueue threading layer cannot share, and most calls cover a single beam anyway
+if njit is not None:
+    interpolate_on_beams = njit(cache=True)(_interpolate_on_beams_loop)
+else:
+    interpolate_on_beams = _interpolate_on_beams_numpy
+
+def float_rows(rows, width):
+    """Rows of numeric text fields as an (n, width) float array; rows that don't convert are dropped."""
+    try:
+        return np.array(rows, dtype=float).reshape(-1, width)
+    except ValueError:
+        # Rare malformed row; only then is each row converted on its own
+        kept = []
+        for row in rows:
+            try:
+                kept.append(tuple(map(float, row)))
+            except ValueError:
+                continue
+        return np.array(kept, dtype=float).reshape(-1, width)
+
+# === PARSING ===
+@dataclass(frozen=True)
+class ParsedData:
+    """Everything parse_all extracts from one upload."""
+    stramienlijnen: dict  # Grid line name -> [(x1, y1), (x2, y2)]
+    balken: list  # (begin, eind) node codes per beam
+    beam_lengths: np.ndarray  # (beams,) length (m) of beam i+1, 0 when DOORSNEDESECTOREN lists none
+    balk_xyz: np.ndarray  # (beams, 2, 2) endpoint coordinates, NaN when unplaced
+    ground_stress_data: np.ndarray  # _GS_DTYPE samples
+    load_cases: dict  # B.G -> beam number -> {'point': (n, 2) force/position, 'distributed': (n, 4) q1/q2/start/length}
+    node_labels: list  # Sorted beam end node codes that lie on a known grid line
+    node_xyz: np.ndarray  # (nodes, 3) coordinates matching node_labels
+
+@st.cache_data(max_entries=4)
+def parse_all(file_bytes):
+    """Parse an uploaded analysis file into grid lines, beams, stresses and loads.
+    
+    Cached on the raw upload bytes so widget interactions don't re-run the parser.
+    """
+    if not file_bytes:
+        return None
+    lines = read_lines(file_bytes, section_spans(file_bytes))
+    
+    stramienlijnen = {}
+    balken = []
+    ground_stress_data = np.empty(0, dtype=_GS_DTYPE)
+    load_cases = {}
+    
+    max_positions = {}  # Track max position for each stramienlijn
+    gs_lines = []  # Raw displacement table rows, converted in bulk after the scan
+    section_lengths = {}  # Beam number -> length from DOORSNEDESECTOREN
+    
+    # === PARSE SECTIONS (single pass) ===
+    section = _SEC_NONE
+    opened = set()  # One-shot sections already read
+    current_bg = None
+    current_beam = None
+    
+    for line in lines:
+        stripped = line.lstrip()
+        if not stripped:
+            continue
+        
+        # Section headers move the state machine; see next_section for the rules
+        if stripped.startswith(_SECTION_TOKENS):
+            section = next_section(stripped, section, opened)
+            bg_match = _VLD_HDR_RE.match(stripped) if section == _SEC_LOAD else None
+            if bg_match:
+                current_bg = int(bg_match.group(1))
+                current_beam = None  # Beam numbers don't carry over into the next load case
+                if current_bg not in load_cases:
+                    load_cases[current_bg] = {}
+            continue
+        
+        if section == _SEC_NONE:
+            continue
+        
+        parts = stripped.split()
+        
+        if section == _SEC_STRAM:
+            # Nr  Naam  X1  Y1  X2  Y2
+            if len(parts) >= 6 and parts[0].isdigit():
+                try:
+                    x1, y1, x2, y2 = map(float, parts[2:6])
+                except ValueError:
+                    continue
+                stramienlijnen[parts[1]] = [(x1, y1), (x2, y2)]
+        
+        elif section == _SEC_BALK:
+            # Nr  Type  Begin  Eind
+            if len(parts) >= 4 and parts[0].isdigit():
+                begin = parts[2]
+                eind = parts[3]
+                balken.append((begin, eind))
+                
+                # Track max positions for each line
+                for coord in [begin, eind]:
+                    if ';' in coord:
+                        lijn_naam, pos_str = coord.split(';')
+                        pos = int(pos_str)
+                        if lijn_naam not in max_positions:
+                            max_positions[lijn_naam] = pos
+                        else:
+                            max_positions[lijn_naam] = max(max_positions[lijn_naam], pos)
+        
+        elif section == _SEC_SECTIONS:
+            # Balk N:M  B  H  L; the first row listed for a beam sets its length
+            if parts[0] != 'Balk' or len(parts) < 5:
+                continue
+            
+            beam_str, colon, _ = parts[1].partition(':')
+            if colon and beam_str.isdigit() and parts[4].replace('.', '', 1).isdigit():
+                section_lengths.setdefault(int(beam_str), float(parts[4]))
+        
+        elif section == _SEC_LOAD:
+            # Balk N:M  Nr  Type  values...
+            if parts[0] != 'Balk' or len(parts) < 2:
+                continue
+            
+            beam_str, colon, _ = parts[1].partition(':')
+            if colon and beam_str.isdigit():
+                current_beam = int(beam_str)
+                if current_beam not in load_cases[current_bg]:
+                    load_cases[current_bg][current_beam] = {'point': [], 'distributed': []}
+            else:
+                current_beam = None  # A row whose beam id doesn't parse is skipped
+            
+            if not current_beam or len(parts) < 6:
+                continue
+            
+            # Fields stay text here and are converted per beam after the scan
+            if parts[3] == '1:q-last' and len(parts) >= 8:
+                # q1, q2, distance, length
+                load_cases[current_bg][current_beam]['distributed'].append(parts[4:8])
+            elif parts[3] == '8:Puntlast':
+                # force, position
+                load_cases[current_bg][current_beam]['point'].append(parts[4:6])
+        
+        elif section == _SEC_GS:
+            # Balk  Pnt  Afst  ux  uy  uz  phi  sigma
+            if len(parts) >= 8 and parts[0].isdigit() and parts[1].isdigit():
+                gs_lines.append(line)
+    
+    # Each beam's loads become one array per load type
+    for beams in load_cases.values():
+        for beam_num, rows in beams.items():
+            beams[beam_num] = {
+                'point': float_rows(rows['point'], 2),
+                'distributed': float_rows(rows['distributed'], 4)
+            }
+    
+    beam_lengths = np.zeros(len(balken))
+    for beam_num, length in section_lengths.items():
+        if 1 <= beam_num <= len(balken):
+            beam_lengths[beam_num - 1] = length
+    
+    # === NODE TABLE ===
+    # Grid nodes are shared between beams, so each distinct code is resolved only once
+    nodes, node_of_end = np.unique(np.array(balken, dtype=str).reshape(-1, 2), return_inverse=True)
+    node_xy = resolve_nodes(nodes.tolist(), stramienlijnen, max_positions)
+    placed = ~np.isnan(node_xy[:, 0])
+    node_labels = nodes[placed].tolist()
+    node_xyz = np.column_stack((node_xy[placed], np.zeros(placed.sum())))
+    
+    # === BALK ENDPOINT TABLE ===
+    # balk_xyz[i, 0/1] = (x, y) of the start/end of beam i+1, NaN if either grid line is unknown
+    balk_xyz = node_xy[node_of_end.reshape(-1, 2)]
+    balk_xyz[np.isnan(balk_xyz).any(axis=(1, 2))] = np.nan
+    
+    # === GROUND STRESS COORDINATES ===
+    # One loadtxt call parses the whole table as (beam, position, stress) rows
+    gs_table = np.empty((0, 3))
+    if gs_lines:
+        try:
+            gs_table = np.loadtxt(gs_lines, usecols=(0, 2, 7), ndmin=2)
+        except ValueError:
+            # Some row isn't numeric where expected; fall back to the strict row pattern
+            rows = [(float(m.group(1)), float(m.group(3)), float(m.group(8))) for m in map(_GS_RE.match, gs_lines) if m]
+            gs_table = np.array(rows).reshape(-1, 3)
+    
+    beam_nums = gs_table[:, 0].astype(int)
+    in_range = (beam_nums >= 1) & (beam_nums <= len(balken))
+    if in_range.any():
+        idx = beam_nums[in_range] - 1
+        positions = gs_table[in_range, 1]
+        stresses = gs_table[in_range, 2]
+        
+        keep = (beam_lengths[idx] > 0) & ~np.isnan(balk_xyz[idx, 0, 0])
+        xs, ys = interpolate_on_beams(idx[keep], positions[keep], beam_lengths, balk_xyz)
+        
+        ground_stress_data = np.empty(len(xs), dtype=_GS_DTYPE)
+        ground_stress_data['beam'] = idx[keep] + 1
+        ground_stress_data['position'] = positions[keep]
+        ground_stress_data['stress'] = stresses[keep]
+        ground_stress_data['x'] = xs
+        ground_stress_data['y'] = ys
+    
+    return ParsedData(
+        stramienlijnen=stramienlijnen,
+        balken=balken,
+        beam_lengths=beam_lengths,
+        balk_xyz=balk_xyz,
+        ground_stress_data=ground_stress_data,
+        load_cases=load_cases,
+        node_labels=node_labels,
+        node_xyz=node_xyz
+    )